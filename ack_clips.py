@@ -0,0 +1,94 @@
+# ack_clips.py
+import asyncio
+import random
+
+ACK_PHRASES = ["Copy that.", "Stand by.", "Affirmative.", "Checking."]
+
+EWMA_ALPHA = 0.3
+
+class AckClipBank:
+    """Pre-rendered acknowledgement clips (48 kHz stereo chunks), one bank per voice/FX setting."""
+
+    def __init__(self):
+        self.banks = {}
+        self._renders = {}
+
+    def ensure(self, key, render):
+        """Render the bank for `key` in the background unless it exists or is rendering.
+
+        `render` is a zero-argument coroutine function returning a list of clips.
+        """
+        if key in self.banks:
+            return None
+        task = self._renders.get(key)
+        if task and not task.done():
+            return task
+
+        async def run():
+            try:
+                clips = await render()
+            except Exception as e:
+                print(f"[Ack] Failed to render clips for {key}: {e}")
+                return
+            if clips:
+                self.banks[key] = clips
+                print(f"[Ack] {len(clips)} clips ready for {key}")
+
+        task = self._renders[key] = asyncio.create_task(run())
+        return task
+
+    def pick(self, key):
+        clips = self.banks.get(key)
+        return random.choice(clips) if clips else None
+
+class TtfaEstimator:
+    """EWMA of time from end of user speech to first reply audio, per model."""
+
+    def __init__(self):
+        self.estimates = {}
+
+    def expected(self, model):
+        return self.estimates.get(model)
+
+    def record(self, model, seconds):
+        previous = self.estimates.get(model)
+        self.estimates[model] = seconds if previous is None else previous + EWMA_ALPHA * (seconds - previous)
+
+class AckPlayback:
+    """Plays one clip after a short grace period, unless the real reply gets there first.
+
+    Call finish() right before the first real audio chunk is sent: if the clip
+    has not started it is cancelled, otherwise it is allowed to complete so the
+    reply follows it without interleaving.
+    """
+
+    def __init__(self, websocket, clip, grace):
+        self.websocket = websocket
+        self.clip = clip
+        self.grace = grace
+        self.started = False
+        self.task = asyncio.create_task(self._play())
+
+    async def _play(self):
+        await asyncio.sleep(self.grace)
+        self.started = True
+        for chunk in self.clip:
+            await self.websocket.send(chunk)
+
+    async def finish(self):
+        if not self.started:
+            self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"[Ack] Playback failed: {e}")
+
+    async def cancel(self):
+        """Stop the clip even if it is already playing (the reply was interrupted)."""
+        self.task.cancel()
+        try:
+            await self.task
+        except (asyncio.CancelledError, Exception):
+            pass
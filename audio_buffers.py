@@ -0,0 +1,51 @@
+# audio_buffers.py
+
+class ByteAccumulator:
+    """Gathers incoming audio chunks and joins them once, on demand.
+
+    Appending to immutable bytes (`buf += chunk`) copies the whole buffer each
+    time; a bytearray plus `bytes(buffer)` copies twice. Keeping references to
+    the chunks and joining them when a block is needed costs a single copy,
+    and yields the immutable bytes that PyAudio and subprocess pipes expect.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, data):
+        if data:
+            self._parts.append(data)
+            self.size += len(data)
+
+    def take(self, padding=b""):
+        """Return everything accumulated (plus optional padding) as bytes and reset."""
+        if padding:
+            self._parts.append(padding)
+        data = b"".join(self._parts)
+        self._parts = []
+        self.size = 0
+        return data
+
+    def clear(self):
+        self._parts = []
+        self.size = 0
+
+def iter_views(data, size):
+    """Yield consecutive memoryview slices of `data` without copying."""
+    view = memoryview(data)
+    for i in range(0, len(view), size):
+        yield view[i:i + size]
+
+_silence_cache = {}
+
+def silence(num_bytes):
+    """Shared zero-filled padding, allocated once per length."""
+    pad = _silence_cache.get(num_bytes)
+    if pad is None:
+        pad = _silence_cache[num_bytes] = bytes(num_bytes)
+    return pad
+
@@ -0,0 +1,129 @@
+# audio_queues.py
+import asyncio
+import queue
+
+MIC_POLICIES = ("drop_oldest", "drop_newest")
+PLAYBACK_POLICIES = ("block", "drop_newest")
+
+def _check_policy(name, policy, allowed):
+    if policy not in allowed:
+        print(f"[Queue] Unknown {name} policy '{policy}', using '{allowed[0]}'")
+        return allowed[0]
+    return policy
+
+class _QueueStats:
+    def _init_stats(self, name, maxsize, policy):
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self.puts = 0
+        self.drops = 0
+        self.peak_depth = 0
+
+    def _track(self):
+        self.puts += 1
+        depth = self.depth()
+        if depth > self.peak_depth:
+            self.peak_depth = depth
+
+    def stats(self):
+        return {
+            "depth": self.depth(),
+            "peak_depth": self.peak_depth,
+            "maxsize": self.maxsize,
+            "puts": self.puts,
+            "drops": self.drops,
+        }
+
+class MicQueue(_QueueStats):
+    """Bounded asyncio queue fed from the PortAudio callback thread.
+
+    The callback hands frames to the event loop with call_soon_threadsafe,
+    so the sender awaits frames directly instead of paying a thread hop per
+    frame. When the websocket stalls, old frames are dropped rather than
+    sent late as stale audio.
+    """
+
+    def __init__(self, loop, maxsize=32, policy="drop_oldest"):
+        self._loop = loop
+        self._q = asyncio.Queue(maxsize)
+        self._init_stats("mic", maxsize, _check_policy("mic", policy, MIC_POLICIES))
+
+    def depth(self):
+        return self._q.qsize()
+
+    def put_threadsafe(self, item):
+        try:
+            self._loop.call_soon_threadsafe(self._put, item)
+        except RuntimeError:
+            pass  # loop closed during shutdown
+
+    def _put(self, item):
+        if self._q.full():
+            self.drops += 1
+            if self.policy == "drop_newest":
+                return
+            self._q.get_nowait()
+        self._q.put_nowait(item)
+        self._track()
+
+    async def get(self):
+        return await self._q.get()
+
+class PlaybackQueue(_QueueStats):
+    """Bounded thread-safe queue between the websocket reader and the playback thread.
+
+    With the "block" policy a full queue stalls the reader, which pushes back
+    on the server through the websocket instead of growing memory. Control
+    markers ("__END__", None) are never dropped.
+    """
+
+    def __init__(self, maxsize=16, policy="block"):
+        self._q = queue.Queue(maxsize)
+        self._init_stats("playback", maxsize, _check_policy("playback", policy, PLAYBACK_POLICIES))
+        self.blocked = 0
+
+    def depth(self):
+        return self._q.qsize()
+
+    def put(self, item):
+        # Blocking put; for control markers and non-async callers
+        self._q.put(item)
+        self._track()
+
+    async def put_async(self, item):
+        try:
+            self._q.put_nowait(item)
+        except queue.Full:
+            if self.policy == "drop_newest" and isinstance(item, (bytes, bytearray, memoryview)):
+                self.drops += 1
+                return
+            self.blocked += 1
+            await asyncio.to_thread(self._q.put, item)
+        self._track()
+
+    def get(self):
+        return self._q.get()
+
+    def clear(self):
+        while True:
+            try:
+                self._q.get_nowait()
+            except queue.Empty:
+                break
+
+    def stats(self):
+        return {**super().stats(), "blocked": self.blocked}
+
+async def report_queue_stats(queues, interval):
+    """Periodically log depth and drop counters for the given queues."""
+    if not interval or interval <= 0:
+        return
+    last = None
+    while True:
+        await asyncio.sleep(interval)
+        snapshot = {q.name: q.stats() for q in queues}
+        if snapshot != last:
+            for name, stats in snapshot.items():
+                print(f"[Queue] {name}: {stats}")
+            last = snapshot
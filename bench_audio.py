@@ -0,0 +1,172 @@
+# bench_audio.py
+#
+# Allocation benchmark of the reply audio path. Drives the real
+# server.speak_reply / stream_tts and client.receive_audio with a fake Piper
+# process, a scripted LLM token stream and an in-memory websocket, with the
+# speaker drained at real-time speed, and reports what Python allocated.
+#
+#   python3 bench_audio.py                 # a 60 s reply
+#   python3 bench_audio.py --seconds 20 --fx --voice ryan-low.onnx
+#
+# Needs the same environment as the server (sox on the PATH, the server and
+# client dependencies installed); no audio devices or Ollama are used.
+import argparse
+import asyncio
+import gc
+import sys
+import threading
+import time
+import tracemalloc
+
+import server
+import client
+from audio_queues import PlaybackQueue
+from radio_fx import RadioFX
+from utils import get_voice_sample_rate
+
+# Stands in for `piper --output_raw`: one line of text in, a sentence of raw
+# 16-bit mono PCM out, after a synthesis delay proportional to its length
+FAKE_PIPER = r"""
+import math, sys, time
+rate, rtf, per_char = int(sys.argv[1]), float(sys.argv[2]), float(sys.argv[3])
+for line in sys.stdin:
+    seconds = max(0.5, per_char * len(line.strip()))
+    n = int(rate * seconds)
+    tone = bytearray()
+    for i in range(n):
+        tone += int(8000 * math.sin(2 * math.pi * 180 * i / rate)).to_bytes(2, "little", signed=True)
+    time.sleep(seconds * rtf)
+    sys.stdout.buffer.write(tone)
+    sys.stdout.buffer.flush()
+"""
+
+SECONDS_PER_CHAR = 0.065  # fake Piper speaking rate
+PADDING_S = 0.3  # silence stream_tts appends to every sentence
+
+SENTENCES = [
+    "Halt, citizen.",
+    "This sector is under Imperial control until further notice.",
+    "Present your identification and state your business.",
+    "Move along, there is nothing to see here.",
+    "Any further questions will be directed to my commanding officer.",
+    "Have a productive day.",
+]
+
+class BenchSocket:
+    """Server -> client websocket in memory. Each message arrives as a fresh
+    bytes object, as it would from the network."""
+
+    def __init__(self):
+        self.q = asyncio.Queue()
+
+    async def send(self, message):
+        await self.q.put(message if isinstance(message, str) else bytes(message))
+
+    async def close(self):
+        await self.q.put(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.q.get()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+def reply_sentences(seconds):
+    """Cycle through SENTENCES until the rendered reply reaches `seconds` of audio."""
+    sentences = []
+    total = 0.0
+    while total < seconds:
+        sentence = SENTENCES[len(sentences) % len(SENTENCES)]
+        sentences.append(sentence)
+        total += max(0.5, SECONDS_PER_CHAR * len(sentence)) + PADDING_S
+    return sentences
+
+async def fake_llm(text, tokens_per_s):
+    for word in text.split(" "):
+        await asyncio.sleep(1 / tokens_per_s)
+        yield " " + word
+
+def drain_speaker(done):
+    # Plays nothing, but consumes at 48 kHz stereo real time like stream.write
+    while True:
+        data = client.playback_q.get()
+        if data is None or data == "__END__":
+            break
+        time.sleep(len(data) / server.OUTPUT_BYTES_PER_SECOND)
+    done.set()
+
+async def run(args):
+    sentences = reply_sentences(args.seconds)
+    text = " ".join(sentences)
+    sample_rate = get_voice_sample_rate(args.voice)
+    session_config = {"voice": args.voice, "retro_voice_fx": False}
+
+    # receive_audio's globals, normally set up in client.main()
+    client.MUTE_MIC = False
+    client.mic_stream = None
+    client.playback_q = PlaybackQueue(16, "block")
+    client.find_device = lambda *a, **k: None  # no audio hardware
+    server.led_request = client.led_request = lambda *a: None
+
+    piper = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", FAKE_PIPER, str(sample_rate), str(args.rtf), str(SECONDS_PER_CHAR),
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE
+    )
+    ws = BenchSocket()
+    played = threading.Event()
+    fx = RadioFX(sample_rate) if args.fx else None
+
+    gc.collect()
+    gc_before = gc.get_stats()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start(args.frames)
+    start = time.perf_counter()
+
+    speaker = threading.Thread(target=drain_speaker, args=(played,), daemon=True)
+    speaker.start()
+    receiver = asyncio.create_task(client.receive_audio(ws, {"fade_duration_ms": 50}))
+    _, chunks = await server.speak_reply(ws, fake_llm(text, args.tokens_per_s), piper, session_config, fx)
+    await ws.send("__END__")
+    await ws.close()
+    await receiver
+    await asyncio.to_thread(played.wait)
+    elapsed = time.perf_counter() - start
+
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks_after = sys.getallocatedblocks()
+    gc_after = gc.get_stats()
+    piper.stdin.close()
+    await piper.wait()
+
+    audio_s = sum(len(c) for c in chunks) / server.OUTPUT_BYTES_PER_SECOND
+    print(f"[Bench] {len(sentences)} sentences, {audio_s:.1f}s of audio at {sample_rate} Hz "
+          f"(fx={'on' if fx else 'off'}), wall {elapsed:.1f}s")
+    print(f"[Bench] tracemalloc peak {peak / 1e6:.2f} MB, live at end {current / 1e6:.2f} MB "
+          f"(reply audio kept for the cache/repeat)")
+    print(f"[Bench] allocated blocks +{blocks_after - blocks_before}")
+    for gen, (before, after) in enumerate(zip(gc_before, gc_after)):
+        collections = after["collections"] - before["collections"]
+        print(f"[Bench] gc gen{gen}: {collections} collections ({collections / elapsed:.2f}/s), "
+              f"{after['collected'] - before['collected']} objects collected")
+
+    # Where the live memory sits, for the modules on the audio path
+    filters = [tracemalloc.Filter(True, f"*{name}.py") for name in ("server", "client", "audio_buffers", "audio_queues", "radio_fx")]
+    for stat in snapshot.filter_traces(filters).statistics("lineno")[:args.top]:
+        print(f"[Bench]   {stat}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Allocation benchmark of the reply audio path")
+    parser.add_argument("--seconds", type=float, default=60, help="length of the reply audio")
+    parser.add_argument("--voice", default="ryan-low.onnx", help="voice whose sample rate to use")
+    parser.add_argument("--fx", action="store_true", help="run the retro radio chain")
+    parser.add_argument("--rtf", type=float, default=0.2, help="fake Piper real-time factor")
+    parser.add_argument("--tokens-per-s", type=float, default=15)
+    parser.add_argument("--frames", type=int, default=1, help="tracemalloc traceback depth")
+    parser.add_argument("--top", type=int, default=8)
+    asyncio.run(run(parser.parse_args()))
@@ -2,7 +2,6 @@
 import asyncio
 import pyaudio
 import numpy as np
-import queue
 import json
 import websockets
 import subprocess
@@ -12,27 +11,33 @@ import time
 from utils import load_config, find_device, list_pyaudio_devices
 import threading
 from utils import apply_fade, led_request
+from audio_buffers import ByteAccumulator
+from audio_queues import MicQueue, PlaybackQueue, report_queue_stats
 
-audio_q = queue.Queue()
-playback_q = queue.Queue()
+audio_q = None  # MicQueue, created in main() once the event loop is running
+playback_q = None  # PlaybackQueue
 
 mic_was_muted = False  # shared state
+playback_active = False  # reply audio queued or playing; the mic LED stays quiet
 
 async def send_audio(ws,config):
     # includes resampling for the Shure mic which only supports rate=48000
+    rate = config.get("mic_rate", 48000)  # fallback to old default
+    # int16 in, int16 out: no clip/astype copies, and filter state carries across frames
+    resampler = soxr.ResampleStream(rate, 16000, 1, dtype="int16")
     while True:
-        data = await asyncio.to_thread(audio_q.get)
-        audio_np = data.flatten()  # ensure 1D
-        rate = config.get("mic_rate", 48000)  # fallback to old default
-        resampled_np = soxr.resample(audio_np, rate, 16000)
-        clipped = np.clip(resampled_np, -32768, 32767).astype(np.int16)
-        await ws.send(clipped.tobytes())
+        data = await audio_q.get()
+        audio_np = data.reshape(-1)  # ensure 1D (view, no copy)
+        resampled_np = resampler.resample_chunk(audio_np)
+        if resampled_np.size:
+            await ws.send(memoryview(resampled_np).cast("B"))
 
 
 def audio_playback_worker(output_device_index, loop):
     global mic_stream
     global mic_was_muted
     global MUTE_MIC
+    global playback_active
 
     p = pyaudio.PyAudio()
     stream = p.open(
@@ -52,6 +57,7 @@ def audio_playback_worker(output_device_index, loop):
         
         if data == "__END__":
             print("[Playback] Finished final chunk")
+            playback_active = False
 
             # Reactivate mic here
             if MUTE_MIC and mic_stream and not mic_stream.is_active():
@@ -80,8 +86,9 @@ def audio_playback_worker(output_device_index, loop):
 async def receive_audio(ws, config):
     global mic_stream
     global mic_was_muted
+    global playback_active
 
-    buffer = bytearray()
+    buffer = ByteAccumulator()
     mic_was_muted = False
     fade_duration = config.get("fade_duration_ms", 0)
     is_first_chunk = True
@@ -93,7 +100,7 @@ async def receive_audio(ws, config):
     try:
         async for message in ws:
             if isinstance(message, bytes):
-                buffer += message
+                buffer.append(message)
 
                 if len(buffer) >= 48000:
                     #print(f"[Client] Playing {len(buffer)} bytes")
@@ -103,27 +110,51 @@ async def receive_audio(ws, config):
                         mic_stream.stop_stream()
                         mic_was_muted = True
 
-                    chunk = bytes(buffer)
+                    chunk = buffer.take()
+                    playback_active = True
 
                     # Apply fade-in to the first chunk
                     if is_first_chunk and fade_duration > 0:
                         chunk = apply_fade(chunk, fade_duration, apply_in=True, apply_out=False)
                         is_first_chunk = False
 
-                    playback_q.put(chunk)
-                    buffer = bytearray()
+                    await playback_q.put_async(chunk)
+
+            elif isinstance(message, str) and message.startswith("{"):
+                try:
+                    data = json.loads(message)
+                except json.JSONDecodeError:
+                    continue
+                if data.get("type") == "model_status":
+                    state = data.get("state")
+                    print(f"[Client] Model {data.get('model')}: {state} "
+                          f"(ollama={data.get('ollama')}, piper={data.get('piper')})")
+                    if state == "ready":
+                        led_request("solid")
+                    elif state == "loading":
+                        led_request("blink")  # warming up, not stalled
+
+            elif isinstance(message, str) and message.strip() == "__STOP__":
+                print("[Client] Received __STOP__")
+                buffer.clear()
+                playback_q.clear()
+                is_first_chunk = True
+                await playback_q.put_async("__END__")
+
+            elif isinstance(message, str) and message.strip() == "__END_SESSION__":
+                print("[Client] Received __END_SESSION__")
+                led_request("end_session")  # main.py owns the session lifecycle
 
             elif isinstance(message, str) and message.strip() == "__END__":
                 print("[Client] Received __END__")
                 # Send remaining buffered audio with fade-out
                 if buffer:
-                    chunk = bytes(buffer)
+                    chunk = buffer.take()
                     if fade_duration > 0:
                         chunk = apply_fade(chunk, fade_duration, apply_in=False, apply_out=True)
-                    playback_q.put(chunk)
-                    buffer = bytearray()
+                    await playback_q.put_async(chunk)
                 is_first_chunk = True
-                playback_q.put("__END__")
+                await playback_q.put_async("__END__")
     finally:
         pass
 
@@ -131,14 +162,22 @@ async def receive_audio(ws, config):
 last_led_update = 0  # global or persistent variable
 LED_DEBOUNCE_INTERVAL = 0.5  # seconds (500ms)
 
+# Scratch for the LED volume check; only touched from the PortAudio callback thread
+mic_level_scratch = np.empty(4096, dtype=np.float32)
+
 def mic_stream_callback(in_data, frame_count, time_info, status):
-    global last_led_update
-    audio_np = np.frombuffer(in_data, dtype=np.int16)
-    audio_q.put(audio_np)
+    global last_led_update, mic_level_scratch
+    audio_np = np.frombuffer(in_data, dtype=np.int16)  # view over in_data, no copy
+    audio_q.put_threadsafe(audio_np)
     #print("[Mic] Callback triggered")
-    volume = np.abs(audio_np).mean()
+    if audio_np.size > mic_level_scratch.size:
+        mic_level_scratch = np.empty(audio_np.size, dtype=np.float32)
+    level = mic_level_scratch[:audio_np.size]
+    np.abs(audio_np, out=level, casting="unsafe")
+    volume = level.mean()
     now = time.time()
-    if volume > 750 and (now - last_led_update > LED_DEBOUNCE_INTERVAL):
+    # With the mic open during playback it hears the speaker; don't show that as listening
+    if volume > 750 and not playback_active and (now - last_led_update > LED_DEBOUNCE_INTERVAL):
         led_request("listen")
         last_led_update = now
     return (None, pyaudio.paContinue)
@@ -148,11 +187,22 @@ mic_stream = None  # Global reference for mic control
 fade_duration = 0
 
 async def main():
-    global mic_stream, MUTE_MIC
+    global mic_stream, MUTE_MIC, audio_q, playback_q
 
     # === Load Config ===
     config = load_config()
 
+    loop = asyncio.get_running_loop()
+    audio_q = MicQueue(
+        loop,
+        config.get("mic_queue_size", 32),
+        config.get("mic_queue_policy", "drop_oldest")
+    )
+    playback_q = PlaybackQueue(
+        config.get("playback_queue_size", 16),
+        config.get("playback_queue_policy", "block")
+    )
+
     list_pyaudio_devices()
 
     print(f"[Config] Looking for output device match: '{config['audio_output_device']}'")
@@ -171,7 +221,11 @@ async def main():
         return
     DEVICE_INFO = pa.get_device_info_by_index(MIC_INDEX)
     RATE = int(DEVICE_INFO["defaultSampleRate"])
-    MUTE_MIC = config.get("mute_mic_during_playback", True)
+    # Opt-in: spoken commands during a reply need the mic left open; the
+    # server ignores everything but command phrases while the trooper talks
+    MUTE_MIC = config.get("mute_mic_during_playback", True) and not (
+        config.get("commands_during_playback", False) and config.get("command_phrases")
+    )
     config["mic_rate"] = RATE  # Inject it into config for use elsewhere
     print(f"[Debug] Using mic sample rate: {RATE} Hz")
 
@@ -208,7 +262,6 @@ async def main():
             "config": config
         }))
 
-        loop = asyncio.get_running_loop()
         global outgoing_ws
         outgoing_ws = ws  # still needed globally
 
@@ -221,7 +274,8 @@ async def main():
 
         await asyncio.gather(
             send_audio(ws, config),
-            receive_audio(ws, config)
+            receive_audio(ws, config),
+            report_queue_stats([audio_q, playback_q], config.get("queue_stats_interval", 30))
         )
     mic_stream.stop_stream()
     mic_stream.close()
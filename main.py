@@ -13,8 +13,7 @@ import wave
 import io
 import pyaudio
 from utils import load_config, find_device, get_voice_sample_rate
-import asyncio
-import aiohttp
+from radio_fx import RadioFX
 import glob, shutil
 
 Device.pin_factory = LGPIOFactory()
@@ -53,7 +52,13 @@ def led_pipe_listener():
         with open(FIFO_PATH, "r") as fifo:
             for line in fifo:
                 mode = line.strip()
-                if mode:
+                if mode == "end_session":
+                    # Spoken "goodbye" relayed from the client
+                    if session_active[0]:
+                        session_active[0] = False
+                        closing_msg = config.get("closing_message", "").strip()
+                        threading.Thread(target=end_session, args=(closing_msg,), daemon=True).start()
+                elif mode:
                     #print(f"[LED] Received mode: {mode}")
                     led_mode(mode)
 
@@ -80,21 +85,14 @@ def play_message(text):
 
     sample_rate = get_voice_sample_rate(voice_model)    
 
-    # Choose SoX pipeline
+    # Retro radio FX in process (radio_fx.py); SoX only resamples
     if retro_fx:
-        sox_cmd = [
-            'sox', '-t', 'raw', '-r', str(sample_rate), '-c', '1', '-b', '16',
-            '-e', 'signed-integer', '-', '-r', '48000', '-c', '2', '-t', 'wav', '-',
-            'highpass', '300', 'lowpass', '3400',
-            'compand', '0.3,1', '6:-70,-60,-20', '-5', '-90', '0.2',
-            'gain', '-n', 'vol', '0.9',
-            'synth', 'brownnoise', 'mix', '0.01'
-        ]
-    else:
-        sox_cmd = [
-            'sox', '-t', 'raw', '-r', str(sample_rate), '-c', '1', '-b', '16',
-            '-e', 'signed-integer', '-', '-r', '48000', '-c', '2', '-t', 'wav', '-'
-        ]    
+        raw_pcm = RadioFX(sample_rate).process(raw_pcm)
+
+    sox_cmd = [
+        'sox', '-t', 'raw', '-r', str(sample_rate), '-c', '1', '-b', '16',
+        '-e', 'signed-integer', '-', '-r', '48000', '-c', '2', '-t', 'wav', '-'
+    ]
 
     # Pipe PCM through SoX to resample to 48000Hz stereo WAV
     sox = subprocess.Popen(
@@ -149,11 +147,7 @@ def session_loop():
     timeout_msg = config.get("timeout_message", "").strip()
     timeout_sec = config.get("session_timeout", 0)
 
-    
-    # Pre-spin Ollama in the background to make if seem faster for the user's first prompt
-    model_name = config.get("model_name")
-    if model_name:
-        threading.Thread(target=spin_up_ollama, args=(model_name,), daemon=True).start()
+    # Ollama warmup and keep-alive are handled by server.py (model_residency.py)
 
     print("[Trooper] Booting up.")
     led_mode("blink")
@@ -215,27 +209,6 @@ def on_button_press():
 def on_tap():
     print("[Button] Ignored short press")        
 
-def spin_up_ollama(model):
-    async def warmup():
-        print(f"[Init] Warming up Ollama model: {model}")
-        payload = {
-            "model": model,
-            "messages": [{"role": "system", "content": "System check."}],
-            "stream": True
-        }
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post("http://localhost:11434/api/chat", json=payload) as resp:
-                    async for line in resp.content:
-                        if line:
-                            print("[Init] Ollama model ready.")
-                            break
-        except Exception as e:
-            print(f"[Init] Ollama warmup failed: {e}")
-
-    asyncio.run(warmup())
-
-
 def vision_watch_loop():
     print("[Vision] Watching for raised hand (MediaPipe)...")
     cap = cv2.VideoCapture(0)
@@ -0,0 +1,158 @@
+# model_residency.py
+import asyncio
+import json
+import os
+import re
+import time
+
+OLLAMA_URL = "http://localhost:11434"
+
+async def ollama_request(path, payload=None, timeout=120):
+    """Small curl-based Ollama API call. Returns parsed JSON, or None on failure."""
+    cmd = ['curl', '-s', '-m', str(timeout)]
+    if payload is not None:
+        cmd += ['-X', 'POST', '-H', 'Content-Type: application/json', '-d', json.dumps(payload)]
+    cmd.append(OLLAMA_URL + path)
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        stdout, _ = await proc.communicate()
+        if proc.returncode != 0 or not stdout:
+            return None
+        return json.loads(stdout)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+def keep_alive_seconds(keep_alive):
+    """Ollama keep_alive ("30m", "1h30m", "300", -1) in seconds; None means never unloaded."""
+    text = str(keep_alive).strip()
+    try:
+        seconds = float(text)
+    except ValueError:
+        units = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+        seconds = sum(float(n) * units[u] for n, u in re.findall(r"(-?[\d.]+)(ms|h|m|s)", text))
+    return None if seconds < 0 else seconds
+
+class ModelResidency:
+    """Keeps Ollama models loaded while sessions are active and tracks their state.
+
+    States per model: "cold", "loading", "ready", "error". Models are loaded
+    with an empty /api/generate request (no tokens generated) carrying
+    keep_alive, and the same request is repeated as a cheap ping so the
+    model is not unloaded between turns. A "ready" model counts as cold again
+    once keep_alive has passed since its last request, and verify() checks
+    /api/ps before a session trusts it.
+    """
+
+    def __init__(self, piper_path, keep_alive="30m", ping_interval=240):
+        self.piper_path = piper_path
+        self.keep_alive = keep_alive
+        self.keep_alive_s = keep_alive_seconds(keep_alive)
+        self.ping_interval = ping_interval
+        self.states = {}
+        self.touched = {}  # model -> time of the last request carrying keep_alive
+        self.health = {"ollama": False, "piper": False}
+        self.active_sessions = 0
+        self._settled_events = {}
+        self._loads = {}
+        self._ping_task = None
+
+    def state(self, model):
+        state = self.states.get(model, "cold")
+        if state == "ready" and self.keep_alive_s is not None:
+            if time.monotonic() - self.touched.get(model, 0) > self.keep_alive_s:
+                self._set_state(model, "cold")  # Ollama has unloaded it by now
+                state = "cold"
+        return state
+
+    def touch(self, model):
+        """Record a request that (re)started the model's keep_alive timer."""
+        self.touched[model] = time.monotonic()
+
+    def status(self, model):
+        return {"type": "model_status", "model": model, "state": self.state(model), **self.health}
+
+    def _set_state(self, model, state):
+        if self.states.get(model) != state:
+            print(f"[Residency] {model}: {state}")
+        self.states[model] = state
+        event = self._settled_events.setdefault(model, asyncio.Event())
+        if state in ("ready", "error"):
+            event.set()
+        else:
+            event.clear()
+
+    async def _load(self, model):
+        self._set_state(model, "loading")
+        result = await ollama_request("/api/generate", {"model": model, "keep_alive": self.keep_alive})
+        if result and result.get("done"):
+            self.touch(model)
+            self._set_state(model, "ready")
+        else:
+            error = result.get("error") if result else "no response"
+            print(f"[Residency] Failed to load {model}: {error}")
+            self._set_state(model, "error")
+
+    def ensure(self, model):
+        """Start loading `model` unless it is already resident or loading. Returns the load task."""
+        task = self._loads.get(model)
+        if task and not task.done():
+            return task
+        if self.state(model) == "ready":
+            return None
+        task = asyncio.create_task(self._load(model))
+        self._loads[model] = task
+        return task
+
+    async def wait_settled(self, model):
+        """Wait until `model` is either ready or has failed to load."""
+        event = self._settled_events.setdefault(model, asyncio.Event())
+        await event.wait()
+
+    async def check_health(self):
+        tags = await ollama_request("/api/tags", timeout=5)
+        self.health["ollama"] = tags is not None
+        self.health["piper"] = os.access(self.piper_path, os.X_OK)
+        if not all(self.health.values()):
+            print(f"[Residency] Backend health: {self.health}")
+        return dict(self.health)
+
+    async def verify(self, models):
+        """Check /api/ps and mark any of `models` Ollama has unloaded as cold."""
+        ps = await ollama_request("/api/ps", timeout=5)
+        if ps is None:
+            return
+        loaded = set()
+        for m in ps.get("models", []):
+            loaded.update((m.get("name"), m.get("model")))
+        for model in models:
+            if self.state(model) == "ready" and model not in loaded:
+                self._set_state(model, "cold")
+
+    async def refresh(self):
+        """Mark models Ollama has unloaded as cold and ping the rest to extend keep_alive."""
+        await self.check_health()
+        await self.verify(list(self.states))
+        for model in list(self.states):
+            if self.state(model) == "ready":
+                if await ollama_request("/api/generate", {"model": model, "keep_alive": self.keep_alive}):
+                    self.touch(model)
+            else:
+                self.ensure(model)
+
+    async def _ping_loop(self):
+        while self.active_sessions > 0:
+            await asyncio.sleep(self.ping_interval)
+            if self.active_sessions > 0:
+                await self.refresh()
+
+    def session_started(self):
+        self.active_sessions += 1
+        if self._ping_task is None or self._ping_task.done():
+            self._ping_task = asyncio.create_task(self._ping_loop())
+
+    def session_ended(self):
+        self.active_sessions = max(0, self.active_sessions - 1)
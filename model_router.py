@@ -0,0 +1,91 @@
+# model_router.py
+import time
+
+# Transcript openings that usually want a considered answer
+OPEN_QUESTION_STARTS = (
+    "why", "how", "explain", "describe", "tell me", "what do you think",
+    "what if", "what would", "can you tell", "what happened",
+)
+
+# Small talk; a greeting alone, or with a few words after it, goes to the fast model
+GREETINGS = (
+    "hi", "hello", "hey", "howdy", "greetings", "yo", "good morning",
+    "good afternoon", "good evening", "how are you", "how's it going",
+    "how do you do", "what's up", "nice to meet you",
+)
+
+def leading_phrase(words, phrases):
+    """Length in words of the longest phrase the word list opens with (whole words only), else 0."""
+    matches = [len(p.split()) for p in phrases if words[:len(p.split())] == p.split()]
+    return max(matches, default=0)
+
+EWMA_ALPHA = 0.3
+
+class ModelRouter:
+    """Chooses between a fast small model and a higher-quality model per turn.
+
+    Uses cheap transcript features (length, question type) and the measured
+    first-token latency of each model. Falls back to the fast model when the
+    quality model is not resident or has been answering slowly.
+    """
+
+    def __init__(self, residency=None):
+        self.residency = residency
+        self.first_token = {}  # model -> EWMA of first-token latency in seconds
+        self.measured_at = {}
+
+    def route(self, transcript, session_config):
+        """Return (model, reason) for a normalized transcript."""
+        quality = session_config["model_name"]
+        fast = session_config.get("fast_model_name") or quality
+        if fast == quality:
+            return quality, "single model"
+
+        settings = session_config.get("model_router", {})
+        tokens = transcript.split()
+        words = len(tokens)
+        greeting = leading_phrase(tokens, GREETINGS)
+        rest = tokens[greeting:]
+        # After a greeting allow for an address first ("hello there trooper, why ...")
+        open_question = any(leading_phrase(rest[i:], OPEN_QUESTION_STARTS) for i in range(3 if greeting else 1))
+
+        if greeting and len(rest) <= settings.get("short_words", 4) and not open_question:
+            return fast, f"greeting ({words} words)"
+        if words <= settings.get("short_words", 4) and not open_question:
+            return fast, f"short ({words} words)"
+        if not open_question and words < settings.get("long_words", 12):
+            return fast, f"simple ({words} words)"
+
+        reason = "open question" if open_question else f"long ({words} words)"
+        if self.residency and self.residency.state(quality) != "ready":
+            return fast, f"{reason}, but {quality} is {self.residency.state(quality)}"
+        ttft = self.first_token.get(quality)
+        max_ttft = settings.get("max_first_token_ms", 4000) / 1000
+        # A slow model gets retried after a while, so one cold start doesn't bench it for good
+        recent = time.monotonic() - self.measured_at.get(quality, 0) < settings.get("retry_after_s", 120)
+        if ttft is not None and ttft > max_ttft and recent:
+            return fast, f"{reason}, but {quality} is slow ({ttft:.2f}s first token)"
+        return quality, reason
+
+    def log_decision(self, model, reason):
+        latencies = ", ".join(f"{m}={t:.2f}s" for m, t in self.first_token.items()) or "no data"
+        print(f"[Router] -> {model} ({reason}) first-token avg: {latencies}")
+
+    def record(self, model, seconds):
+        previous = self.first_token.get(model)
+        self.first_token[model] = seconds if previous is None else previous + EWMA_ALPHA * (seconds - previous)
+        self.measured_at[model] = time.monotonic()
+        print(f"[Router] {model} first token {seconds:.2f}s (avg {self.first_token[model]:.2f}s)")
+
+    async def timed(self, model, tokens):
+        """Pass tokens through, recording the latency to the first non-empty one."""
+        start = time.monotonic()
+        first = True
+        try:
+            async for token in tokens:
+                if first and token:
+                    self.record(model, time.monotonic() - start)
+                    first = False
+                yield token
+        finally:
+            await tokens.aclose()
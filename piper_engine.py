@@ -0,0 +1,199 @@
+# piper_engine.py
+import asyncio
+import json
+import os
+import subprocess
+import threading
+import time
+import numpy as np
+
+# Optional: in-process synthesis needs onnxruntime and piper-phonemize
+try:
+    import onnxruntime
+    from piper_phonemize import phonemize_espeak
+except ImportError:
+    onnxruntime = None
+    phonemize_espeak = None
+
+BOS = "^"
+EOS = "$"
+PAD = "_"
+
+# Split sentences into phrase-sized chunks at these phonemes, so audio for the
+# first phrase is ready before the rest of the sentence is synthesized
+PHRASE_BREAKS = {",", ";", ":", ".", "!", "?", "—"}
+MIN_CHUNK_PHONEMES = 12
+
+_voices = {}
+_voices_lock = threading.Lock()
+
+class PiperOnnxVoice:
+    """A Piper voice (.onnx + .onnx.json) running in process on CPU via onnxruntime."""
+
+    def __init__(self, model_path, threads=0):
+        with open(model_path + ".json", "r") as f:
+            self.config = json.load(f)
+        self.sample_rate = self.config.get("audio", {}).get("sample_rate", 16000)
+        self.espeak_voice = self.config.get("espeak", {}).get("voice", "en-us")
+        self.phoneme_id_map = self.config["phoneme_id_map"]
+        inference = self.config.get("inference", {})
+        self.scales = np.array([
+            inference.get("noise_scale", 0.667),
+            inference.get("length_scale", 1.0),
+            inference.get("noise_w", 0.8),
+        ], dtype=np.float32)
+        self.multi_speaker = self.config.get("num_speakers", 1) > 1
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+    def phoneme_chunks(self, text):
+        """Phonemize text and split it into phrase-sized chunks of phonemes.
+
+        Yields (starts_sentence, phonemes).
+        """
+        for sentence in phonemize_espeak(text, self.espeak_voice):
+            chunk = []
+            first = True
+            for phoneme in sentence:
+                chunk.append(phoneme)
+                if phoneme in PHRASE_BREAKS and len(chunk) >= MIN_CHUNK_PHONEMES:
+                    yield first, chunk
+                    chunk = []
+                    first = False
+            if chunk:
+                yield first, chunk
+
+    def phonemes_to_ids(self, phonemes):
+        ids = list(self.phoneme_id_map[BOS])
+        for phoneme in phonemes:
+            if phoneme not in self.phoneme_id_map:
+                continue
+            ids.extend(self.phoneme_id_map[phoneme])
+            ids.extend(self.phoneme_id_map[PAD])
+        ids.extend(self.phoneme_id_map[EOS])
+        return ids
+
+    def infer(self, phoneme_ids):
+        """Run the model on one chunk; returns float audio."""
+        text = np.expand_dims(np.array(phoneme_ids, dtype=np.int64), 0)
+        inputs = {
+            "input": text,
+            "input_lengths": np.array([text.shape[1]], dtype=np.int64),
+            "scales": self.scales,
+        }
+        if self.multi_speaker:
+            inputs["sid"] = np.array([0], dtype=np.int64)
+        return self.session.run(None, inputs)[0].squeeze()
+
+    @staticmethod
+    def to_pcm(audio, peak):
+        """Scale float audio to 16-bit PCM bytes for the given sentence peak."""
+        audio = audio * (32767 / max(0.01, peak))
+        return np.clip(audio, -32768, 32767).astype(np.int16).tobytes()
+
+    def synthesize(self, text):
+        """Yield PCM per phrase chunk (blocking).
+
+        Piper normalizes each sentence to its peak. Chunks are scaled by the
+        sentence's running peak instead, so the gain never steps up part way
+        through a sentence.
+        """
+        peak = 0.0
+        for first, phonemes in self.phoneme_chunks(text):
+            audio = self.infer(self.phonemes_to_ids(phonemes))
+            peak = max(0.0 if first else peak, float(np.max(np.abs(audio), initial=0.0)))
+            yield self.to_pcm(audio, peak)
+
+    async def synthesize_stream(self, text):
+        """Yield PCM per phrase chunk, running inference off the event loop."""
+        chunks = await asyncio.to_thread(lambda: list(self.phoneme_chunks(text)))
+        peak = 0.0
+        for first, phonemes in chunks:
+            audio = await asyncio.to_thread(self.infer, self.phonemes_to_ids(phonemes))
+            peak = max(0.0 if first else peak, float(np.max(np.abs(audio), initial=0.0)))
+            yield self.to_pcm(audio, peak)
+
+def load_voice(model_path, threads=0):
+    """Load a voice once per process; every connection shares the same session."""
+    if onnxruntime is None:
+        raise RuntimeError("onnxruntime and piper-phonemize are required for the onnx TTS engine")
+    with _voices_lock:
+        voice = _voices.get(model_path)
+        if voice is None:
+            voice = _voices[model_path] = PiperOnnxVoice(model_path, threads)
+            print(f"[Piper] Loaded {model_path} in process ({voice.sample_rate} Hz)")
+        return voice
+
+
+# --- Benchmark: in-process vs. piper subprocess ------------------------------
+#   python3 piper_engine.py voices/danny-low.onnx "Identify yourself, civilian."
+
+def _bench_subprocess(proc, text):
+    # Same read pattern as server.stream_tts against an already running piper
+    start = time.perf_counter()
+    proc.stdin.write(text.encode() + b"\n")
+    proc.stdin.flush()
+    first = None
+    total = 0
+    while True:
+        data = proc.stdout.read1(4096)
+        if first is None:
+            first = time.perf_counter() - start
+        total += len(data)
+        if len(data) < 4096:
+            break
+    return first, time.perf_counter() - start, total
+
+def _bench_onnx(voice, text):
+    start = time.perf_counter()
+    first = None
+    total = 0
+    for pcm in voice.synthesize(text):
+        if first is None:
+            first = time.perf_counter() - start
+        total += len(pcm)
+    return first, time.perf_counter() - start, total
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Compare in-process Piper with the piper binary")
+    parser.add_argument("model", help="path to the voice .onnx (with .onnx.json next to it)")
+    parser.add_argument("text", nargs="?", default="Halt! Identify yourself. This area is restricted, move along.")
+    parser.add_argument("--piper", default="/home/mjw/.local/bin/piper", help="piper binary")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    load_start = time.perf_counter()
+    voice = load_voice(args.model)
+    print(f"[Bench] onnx voice load: {time.perf_counter() - load_start:.2f}s (once per server)")
+
+    piper_proc = None
+    if os.access(args.piper, os.X_OK):
+        piper_proc = subprocess.Popen(
+            [args.piper, "--model", args.model, "--output_raw"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        _bench_subprocess(piper_proc, "Warm up.")
+    else:
+        print(f"[Bench] subprocess: skipped, {args.piper} not found")
+
+    for name, run in (
+        ("subprocess", lambda: _bench_subprocess(piper_proc, args.text)),
+        ("onnx", lambda: _bench_onnx(voice, args.text)),
+    ):
+        if name == "subprocess" and piper_proc is None:
+            continue
+        for i in range(args.runs):
+            first, total, size = run()
+            audio_s = size / 2 / voice.sample_rate
+            print(f"[Bench] {name:<10} run {i + 1}: first audio {first:.3f}s, "
+                  f"total {total:.3f}s, audio {audio_s:.2f}s (RTF {total / max(audio_s, 1e-9):.2f})")
+
+    if piper_proc:
+        piper_proc.stdin.close()
+        piper_proc.wait()
@@ -0,0 +1,223 @@
+# radio_fx.py
+import math
+import numpy as np
+
+# Streaming NumPy version of the SoX retro radio chain:
+#   highpass 300 lowpass 3400 compand 0.3,1 6:-70,-60,-20 -5 -90 0.2
+#   gain -n vol 0.9 synth brownnoise mix 0.01
+# Every stage keeps its state between calls, so audio can be fed in
+# arbitrary chunks (e.g. straight from the Piper pipe) without clicks at
+# chunk boundaries. The filters are exact for any chunking; the compander
+# and normalizer update their gains per chunk, so levels differ slightly.
+
+BLOCK = 128  # biquad block length; each block is one small matrix product
+
+def biquad_coeffs(kind, freq, sample_rate, q=1 / math.sqrt(2)):
+    """RBJ cookbook 2nd-order high/low-pass (Butterworth Q by default, as SoX uses)."""
+    w0 = 2 * math.pi * freq / sample_rate
+    alpha = math.sin(w0) / (2 * q)
+    cos_w0 = math.cos(w0)
+    if kind == "highpass":
+        b = [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2]
+    elif kind == "lowpass":
+        b = [(1 - cos_w0) / 2, 1 - cos_w0, (1 - cos_w0) / 2]
+    else:
+        raise ValueError(f"Unknown filter type: {kind}")
+    a0 = 1 + alpha
+    a = [1.0, -2 * cos_w0 / a0, (1 - alpha) / a0]
+    return [c / a0 for c in b], a
+
+class Biquad:
+    """Stateful biquad evaluated a block at a time without a per-sample Python loop.
+
+    Within a block of length L the filter is linear in the input and in its
+    four state values (x[-1], x[-2], y[-1], y[-2]), so
+        y = H @ x + Z @ state
+    where H is the lower-triangular Toeplitz matrix of the impulse response
+    and Z holds the zero-input response to each state value. Both are
+    computed once; the result is exact, not an FIR approximation.
+    """
+
+    def __init__(self, b, a, block=BLOCK):
+        self.block = block
+        self.state = np.zeros(4)
+        h = self._simulate(b, a, block, impulse=True)
+        idx = np.arange(block)
+        lag = idx[:, None] - idx[None, :]
+        self.H = np.where(lag >= 0, h[np.clip(lag, 0, None)], 0.0)
+        self.Z = np.stack([self._simulate(b, a, block, state=s) for s in np.eye(4)], axis=1)
+
+    @staticmethod
+    def _simulate(b, a, n, impulse=False, state=(0.0, 0.0, 0.0, 0.0)):
+        x1, x2, y1, y2 = state
+        out = np.empty(n)
+        for i in range(n):
+            x0 = 1.0 if impulse and i == 0 else 0.0
+            y0 = b[0] * x0 + b[1] * x1 + b[2] * x2 - a[1] * y1 - a[2] * y2
+            out[i] = y0
+            x1, x2, y1, y2 = x0, x1, y0, y1
+        return out
+
+    def process(self, x):
+        out = np.empty_like(x)
+        state = self.state
+        for start in range(0, len(x), self.block):
+            seg = x[start:start + self.block]
+            m = len(seg)
+            y = self.H[:m, :m] @ seg + self.Z[:m] @ state
+            out[start:start + m] = y
+            if m >= 2:
+                state = np.array([seg[-1], seg[-2], y[-1], y[-2]])
+            else:
+                state = np.array([seg[-1], state[0], y[-1], state[2]])
+        self.state = state
+        return out
+
+class Compander:
+    """SoX-style compand: envelope follower with attack/decay and a dB transfer curve.
+
+    The envelope is updated once per short sub-block (from its peak) and the
+    resulting gain is ramped linearly across the samples, so the Python loop
+    runs a few hundred times per second of audio rather than per sample.
+    SoX's 0.2 s look-ahead delay and 6 dB soft knee are not modelled; a
+    look-ahead would add 200 ms to every sentence.
+    """
+
+    def __init__(self, sample_rate, attack=0.3, decay=1.0, points=((-70, -60), (-20, -20)),
+                 gain_db=-5.0, initial_db=-90.0, sub_block=64):
+        self.sub_block = sub_block
+        block_time = sub_block / sample_rate
+        self.attack = 1 - math.exp(-block_time / attack)
+        self.decay = 1 - math.exp(-block_time / decay)
+        # Below the first point the first segment's offset is kept; above the last, unity slope to 0 dB
+        first_in, first_out = points[0]
+        self.curve_in = np.array([first_in - 60, *[p[0] for p in points], 0.0])
+        self.curve_out = np.array([first_out - 60, *[p[1] for p in points], 0.0])
+        self.gain_db = gain_db
+        self.envelope = 10 ** (initial_db / 20)
+        self.last_gain = None
+
+    def _gain(self, envelope):
+        env_db = 20 * math.log10(max(envelope, 1e-9))
+        out_db = float(np.interp(env_db, self.curve_in, self.curve_out))
+        return 10 ** ((out_db - env_db + self.gain_db) / 20)
+
+    def process(self, x):
+        n = len(x)
+        if n == 0:
+            return x
+        starts = range(0, n, self.sub_block)
+        peaks = np.maximum.reduceat(np.abs(x), list(starts))
+        gains = np.empty(len(peaks))
+        envelope = self.envelope
+        for i, peak in enumerate(peaks):
+            coef = self.attack if peak > envelope else self.decay
+            envelope += (peak - envelope) * coef
+            gains[i] = self._gain(envelope)
+        self.envelope = envelope
+
+        # Ramp from the previous sub-block's gain to each new one
+        previous = self.last_gain if self.last_gain is not None else gains[0]
+        ramp_from = np.concatenate(([previous], gains[:-1]))
+        positions = np.arange(n)
+        block_index = positions // self.sub_block
+        frac = (positions % self.sub_block) / self.sub_block
+        sample_gains = ramp_from[block_index] + (gains[block_index] - ramp_from[block_index]) * frac
+        self.last_gain = gains[-1]
+        return x * sample_gains
+
+class PeakNormalizer:
+    """Streaming stand-in for `gain -n vol 0.9`.
+
+    SoX normalizes the whole sentence after seeing all of it. Here a peak
+    tracker with a slow release sets the gain, capped so silence and noise
+    are not boosted. Gain cuts apply to the whole chunk at once, so a loud
+    onset after quiet input is never boosted past full scale; only
+    increases are ramped.
+    """
+
+    def __init__(self, sample_rate, target=0.9, release=2.0, max_gain_db=20.0):
+        self.target = target
+        self.release_per_sample = math.exp(-1 / (sample_rate * release))
+        self.max_gain = 10 ** (max_gain_db / 20)
+        self.peak = 0.0
+        self.last_gain = None
+
+    def process(self, x):
+        n = len(x)
+        if n == 0:
+            return x
+        self.peak = max(self.peak * self.release_per_sample ** n, float(np.abs(x).max()))
+        gain = min(self.target / self.peak, self.max_gain) if self.peak > 0 else self.max_gain
+        previous = self.last_gain if self.last_gain is not None else gain
+        self.last_gain = gain
+        if gain < previous:
+            return x * gain
+        return x * np.linspace(previous, gain, n, endpoint=False)
+
+class NoiseBed:
+    """Precomputed brown noise loop mixed in at a fixed level."""
+
+    def __init__(self, sample_rate, level=0.01, seconds=3.0, seed=1138):
+        rng = np.random.default_rng(seed)
+        brown = np.cumsum(rng.standard_normal(int(sample_rate * seconds)))
+        # Strip the random-walk drift, leaving the low rumble
+        b, a = biquad_coeffs("highpass", 40, sample_rate)
+        brown = Biquad(b, a).process(brown - brown.mean())
+        self.noise = brown * (level / np.abs(brown).max())
+        self.pos = 0
+
+    def process(self, x):
+        n = len(x)
+        idx = (self.pos + np.arange(n)) % len(self.noise)
+        self.pos = (self.pos + n) % len(self.noise)
+        return x + self.noise[idx]
+
+class RadioFX:
+    """Retro radio voice chain for 16-bit mono PCM at the voice's sample rate."""
+
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+        self.highpass = Biquad(*biquad_coeffs("highpass", 300, sample_rate))
+        self.lowpass = Biquad(*biquad_coeffs("lowpass", min(3400, 0.45 * sample_rate), sample_rate))
+        self.compander = Compander(sample_rate)
+        self.normalizer = PeakNormalizer(sample_rate)
+        self.noise = NoiseBed(sample_rate)
+        self._odd_byte = b""
+
+    def process(self, pcm):
+        """Process a chunk of raw int16 PCM (any length, even odd) and return int16 bytes."""
+        if self._odd_byte:
+            pcm = self._odd_byte + bytes(pcm)
+            self._odd_byte = b""
+        if len(pcm) % 2:
+            self._odd_byte = bytes(pcm[-1:])
+            pcm = pcm[:-1]
+        if not pcm:
+            return b""
+        x = np.frombuffer(pcm, dtype=np.int16) / 32768.0
+        x = self.lowpass.process(self.highpass.process(x))
+        x = self.normalizer.process(self.compander.process(x))
+        x = self.noise.process(x)
+        return (np.clip(x, -1.0, 32767 / 32768) * 32768).astype(np.int16).tobytes()
+
+
+# --- Check: a loud onset after near-silence must not clip ---------------------
+#   python3 radio_fx.py
+
+if __name__ == "__main__":
+    sample_rate = 16000
+    quiet = np.random.default_rng(0).standard_normal(2048) * 0.001
+    loud = 0.6 * np.sin(2 * np.pi * 800 * np.arange(2048) / sample_rate)
+
+    normalizer = PeakNormalizer(sample_rate)
+    normalizer.process(quiet)
+    peak = float(np.abs(normalizer.process(loud)).max())
+    assert peak <= normalizer.target + 1e-9, f"normalizer overshoot: peak {peak:.2f}"
+
+    fx = RadioFX(sample_rate)
+    fx.process((quiet * 32768).astype(np.int16).tobytes())
+    out = np.frombuffer(fx.process((loud * 32768).astype(np.int16).tobytes()), dtype=np.int16)
+    clipped = int(np.count_nonzero((out >= 32767) | (out <= -32768)))
+    assert clipped == 0, f"RadioFX clipped {clipped} of {len(out)} samples"
+    print(f"[RadioFX] quiet-then-loud OK: normalizer peak {peak:.3f}, chain peak {np.abs(out).max() / 32768:.3f}")
@@ -0,0 +1,78 @@
+# response_cache.py
+import random
+import time
+from collections import OrderedDict
+
+class ResponseCache:
+    """Full-turn cache: reply text plus the rendered audio chunks, with LRU and TTL eviction.
+
+    Each key holds up to `variants` replies. Until that many have been
+    generated a lookup counts as a miss, so the caller renders a fresh
+    variant; after that a random variant is served.
+    """
+
+    def __init__(self, max_entries=64, ttl_seconds=3600, variants=1):
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.configure(max_entries, ttl_seconds, variants)
+
+    def configure(self, max_entries=64, ttl_seconds=3600, variants=1):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+        self.variants = max(1, int(variants))
+        self._evict()
+
+    @staticmethod
+    def make_key(transcript, model, system_prompt, voice, retro_voice_fx=False):
+        # transcript is expected to be normalized by the caller
+        return (transcript, model, system_prompt, voice, bool(retro_voice_fx))
+
+    def _expired(self, entry, now):
+        return bool(self.ttl_seconds) and now - entry["created"] > self.ttl_seconds
+
+    def _evict(self):
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _ready_entry(self, key):
+        entry = self.entries.get(key)
+        if entry is not None and self._expired(entry, time.monotonic()):
+            del self.entries[key]
+            entry = None
+        if entry is None or len(entry["variants"]) < self.variants:
+            return None
+        return entry
+
+    def has(self, key):
+        """True if get() would be served from the cache; does not touch stats or LRU order."""
+        return self._ready_entry(key) is not None
+
+    def get(self, key):
+        entry = self._ready_entry(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return random.choice(entry["variants"])
+
+    def put(self, key, text, audio_chunks):
+        now = time.monotonic()
+        entry = self.entries.get(key)
+        if entry is None or self._expired(entry, now):
+            entry = {"created": now, "variants": []}
+            self.entries[key] = entry
+        entry["variants"].append((text, tuple(audio_chunks)))
+        del entry["variants"][:-self.variants]
+        self.entries.move_to_end(key)
+        self._evict()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -4,19 +4,66 @@ import websockets
 import json
 import re
 import os
+import time
+import numpy as np
+import soxr
 from vosk import Model, KaldiRecognizer
 from utils import load_config, led_request
 from utils import get_voice_sample_rate
+from response_cache import ResponseCache
+from audio_buffers import ByteAccumulator, iter_views, silence
+from speculation import SpeculativeStream, SpeculationStats
+from model_residency import ModelResidency
+from model_router import ModelRouter
+from radio_fx import RadioFX
+from piper_engine import PiperOnnxVoice, load_voice
+from ack_clips import ACK_PHRASES, AckClipBank, AckPlayback, TtfaEstimator
 
 RATE = 16000
 CHANNELS = 1
 MODEL_PATH = "vosk-model"
 PIPER_PATH = "/home/mjw/.local/bin/piper"
 
+# Reply audio is sent at most this far ahead of playback, so the client's
+# queue stays short and a "stop" takes effect at once
+MAX_LEAD_S = 2.0
+OUTPUT_BYTES_PER_SECOND = 48000 * 2 * 2  # 48 kHz, stereo, 16-bit
+
 LOW_EFFORT_UTTERANCES = {"huh", "uh", "um", "erm", "hmm", "he's", "but", "the"}
 
+# Spoken control phrases handled locally without an LLM round trip.
+# Overridable per session with the "command_phrases" config key.
+COMMAND_PHRASES = {
+    "stop": "stop_speaking",
+    "be quiet": "stop_speaking",
+    "say again": "repeat",
+    "repeat that": "repeat",
+    "goodbye": "end_session",
+    "over and out": "end_session",
+}
+
 vosk_model = Model(MODEL_PATH)
 
+# Shared across connections so repeated kiosk questions hit across sessions
+response_cache = ResponseCache()
+speculation_stats = SpeculationStats()
+ack_bank = AckClipBank()
+ttfa_estimator = TtfaEstimator()
+residency = None  # ModelResidency, created in main()
+router = None  # ModelRouter, created in main()
+
+def normalize_transcript(text):
+    text = re.sub(r"[^\w\s']", ' ', text.lower())
+    return re.sub(r'\s+', ' ', text).strip()
+
+def build_command_recognizer(command_phrases):
+    # Small grammar-constrained recognizer; decodes a handful of phrases
+    # far faster than the full language model. "[unk]" absorbs everything else.
+    if not command_phrases:
+        return None
+    grammar = json.dumps(list(command_phrases.keys()) + ["[unk]"])
+    return KaldiRecognizer(vosk_model, RATE, grammar)
+
 def clean_response(text):
     text = re.sub(r"[\*]+", '', text)
     text = re.sub(r"\(.*?\)", '', text)
@@ -56,6 +103,9 @@ async def stream_ollama_response(model, messages):
         "messages": messages,
         "stream": True
     }
+    if residency:
+        payload["keep_alive"] = residency.keep_alive
+        residency.touch(model)
     proc = await asyncio.create_subprocess_exec(
         'curl', '-N', '-s', '-X', 'POST', 'http://localhost:11434/api/chat',
         '-H', 'Content-Type: application/json',
@@ -63,50 +113,99 @@ async def stream_ollama_response(model, messages):
         stdout=asyncio.subprocess.PIPE
     )
 
-    async for line in proc.stdout:
-        chunk = line.decode().strip()
-        if not chunk:
-            continue
-        try:
-            json_chunk = json.loads(chunk)
-            token = json_chunk.get("message", {}).get("content", "")
-            yield token
-        except json.JSONDecodeError:
-            continue
-
-async def stream_tts(text, piper_proc, retro_voice_fx, voice):
-    sample_rate = get_voice_sample_rate(voice)
-    piper_proc.stdin.write(text.encode() + b'\n')
-    await piper_proc.stdin.drain()
-
-    raw_pcm = b""
+    try:
+        async for line in proc.stdout:
+            chunk = line.decode().strip()
+            if not chunk:
+                continue
+            try:
+                json_chunk = json.loads(chunk)
+                token = json_chunk.get("message", {}).get("content", "")
+                yield token
+            except json.JSONDecodeError:
+                continue
+    finally:
+        # Closed early (e.g. a cancelled speculative stream): stop generating
+        if proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+            await proc.wait()
+
+def build_context(session_config, user_text):
+    messages = [{"role": "system", "content": session_config.get("system_prompt", "")}]
+    messages.append({"role": "user", "content": user_text})
+    return [messages[0]] + messages[-session_config.get("history_length", 0):]
+
+async def stream_tts_onnx(text, engine, fx):
+    # Each phrase chunk is filtered and resampled as soon as it is synthesized,
+    # so the first audio goes out before the rest of the sentence is rendered
+    resampler = soxr.ResampleStream(engine.sample_rate, 48000, 1, dtype="int16")
+    padding = silence(int(engine.sample_rate * 0.3 * 2))  # 300ms, as in stream_tts
+
+    def to_output(pcm, last=False):
+        mono = resampler.resample_chunk(np.frombuffer(pcm, dtype=np.int16), last=last)
+        return np.repeat(mono, 2).tobytes()  # 48 kHz interleaved stereo
+
+    async for pcm in engine.synthesize_stream(text):
+        if fx:
+            pcm = fx.process(pcm)
+        for chunk in iter_views(to_output(pcm), 2048):
+            yield chunk
+
+    for chunk in iter_views(to_output(fx.process(padding) if fx else padding, last=True), 2048):
+        yield chunk
+
+async def discard_piper_output(piper_proc):
     while True:
         try:
             chunk = await asyncio.wait_for(piper_proc.stdout.read(4096), timeout=2.0)
         except asyncio.TimeoutError:
             break
-        if not chunk:
-            break
-        raw_pcm += chunk
         if len(chunk) < 4096:
             break
 
+async def stream_tts(text, tts, fx, voice):
+    if isinstance(tts, PiperOnnxVoice):
+        async for chunk in stream_tts_onnx(text, tts, fx):
+            yield chunk
+        return
+
+    piper_proc = tts
+    sample_rate = get_voice_sample_rate(voice)
+    pcm = ByteAccumulator()
+    try:
+        piper_proc.stdin.write(text.encode() + b'\n')
+        await piper_proc.stdin.drain()
+
+        while True:
+            try:
+                chunk = await asyncio.wait_for(piper_proc.stdout.read(4096), timeout=2.0)
+            except asyncio.TimeoutError:
+                break
+            if not chunk:
+                break
+            # Retro FX runs in process, chunk by chunk, as audio arrives from Piper
+            pcm.append(fx.process(chunk) if fx else chunk)
+            if len(chunk) < 4096:
+                break
+    except asyncio.CancelledError:
+        # Interrupted mid-sentence: read off the rest of it, or it would come
+        # out of the pipe at the start of the next reply
+        await discard_piper_output(piper_proc)
+        raise
+
     # Ex: Add 100 millisec of silence (bytes = sample_rate * 0.1s * 2 bytes/sample)
     # This seems to help with buffer flushing at the expense of latency.
-    raw_pcm += b"\x00" * int(sample_rate * 0.3 * 2)  # 300ms
+    padding = silence(int(sample_rate * 0.3 * 2))  # 300ms
+    raw_pcm = pcm.take(fx.process(padding) if fx else padding)
 
     sox_cmd = [
         "sox",
         "-t", "raw", "-r", str(sample_rate), "-c", "1", "-b", "16", "-e", "signed-integer", "-",
         "-r", "48000", "-c", "2", "-t", "raw", "-"
     ]
-    if retro_voice_fx:
-        sox_cmd += [
-            "highpass", "300", "lowpass", "3400",
-            "compand", "0.3,1", "6:-70,-60,-20", "-5", "-90", "0.2",
-            "gain", "-n", "vol", "0.9",
-            "synth", "brownnoise", "mix", "0.01"
-        ]
 
     sox_proc = await asyncio.create_subprocess_exec(
         *sox_cmd,
@@ -114,19 +213,288 @@ async def stream_tts(text, piper_proc, retro_voice_fx, voice):
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.DEVNULL
     )
-    sox_stdout, _ = await sox_proc.communicate(input=raw_pcm)
+    try:
+        sox_stdout, _ = await sox_proc.communicate(input=raw_pcm)
+    except asyncio.CancelledError:
+        sox_proc.kill()
+        await sox_proc.wait()
+        raise
+
+    # memoryview slices: no per-chunk copy for websocket sends or the reply cache
+    for chunk in iter_views(sox_stdout, 2048):
+        yield chunk
+
+class PacedSender:
+    """Sends reply audio no more than MAX_LEAD_S ahead of real-time playback.
+
+    The client's playback queue then never fills up and blocks its reader,
+    so a "__STOP__" sent mid-reply is acted on straight away.
+    """
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.started = None
+        self.sent = 0.0  # seconds of audio sent
+
+    async def send(self, chunk):
+        now = time.monotonic()
+        if self.started is None:
+            self.started = now
+        lead = self.sent - (now - self.started)
+        if lead < 0:
+            # The client ran dry (e.g. waiting on the LLM); playback restarts from here
+            self.started = now - self.sent
+        elif lead > MAX_LEAD_S:
+            await asyncio.sleep(lead - MAX_LEAD_S)
+        await self.websocket.send(chunk)
+        self.sent += len(chunk) / OUTPUT_BYTES_PER_SECOND
+
+async def speak_reply(websocket, tokens, tts, session_config, fx=None, before_audio=None):
+    """Speak an LLM token stream sentence by sentence. Returns (text, audio_chunks).
+
+    before_audio, if given, is awaited once just before the first chunk is sent.
+    If cancelled, the token stream (and its curl process) is closed.
+    """
+    voice = session_config["voice"]
+    full_response = ""
+    response_text = ""
+    audio_chunks = []
+    sender = PacedSender(websocket)
+
+    async def send(chunk):
+        nonlocal before_audio
+        if before_audio:
+            await before_audio()
+            before_audio = None
+        audio_chunks.append(chunk)
+        await sender.send(chunk)
+
+    try:
+        async for token in tokens:
+            response_text += token
+            if token.endswith((".", "!", "?", "\n")):
+                segment = clean_response(response_text).strip()
+                if segment and not re.fullmatch(r"[.?!\-–—…]+", segment):
+                    # color code the output
+                    print(f"\033[38;5;75m[Trooper]: {segment}\033[0m")
+                    full_response += segment + " "
+                    led_request("speak")
+                    async for chunk in stream_tts(segment, tts, fx, voice):
+                        await send(chunk)
+                response_text = ""
+
+        if response_text.strip():
+            segment = clean_response(response_text).strip()
+            full_response += segment + " "
+            async for chunk in stream_tts(segment, tts, fx, voice):
+                await send(chunk)
+    finally:
+        await tokens.aclose()
+
+    return full_response.strip(), audio_chunks
+
+async def replay_reply(websocket, chunks):
+    """Re-send a finished reply (cache hit or "say again"), paced like a live one."""
+    led_request("speak")
+    sender = PacedSender(websocket)
+    for chunk in chunks:
+        await sender.send(chunk)
+    await websocket.send("__END__")
+    led_request("solid")
+
+async def render_ack_clips(voice, retro_voice_fx, phrases, tts_engine="subprocess"):
+    """Render acknowledgement clips with a TTS backend of their own, so a live
+    session's Piper pipe is never shared."""
+    voice_model_path = f"voices/{voice}"
+    if not os.path.exists(voice_model_path):
+        print(f"[Ack] Voice model not found: {voice_model_path}")
+        return []
+
+    engine = None
+    proc = None
+    if tts_engine == "onnx":
+        try:
+            engine = await asyncio.to_thread(load_voice, voice_model_path)
+        except Exception as e:
+            print(f"[Ack] In-process engine unavailable, using subprocess: {e}")
+    if engine is None:
+        proc = await asyncio.create_subprocess_exec(
+            PIPER_PATH, '--model', voice_model_path, '--output_raw',
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+
+    clips = []
+    try:
+        sample_rate = get_voice_sample_rate(voice)
+        for phrase in phrases:
+            fx = RadioFX(sample_rate) if retro_voice_fx else None
+            clip = [bytes(chunk) async for chunk in stream_tts(phrase, engine or proc, fx, voice)]
+            if clip:
+                clips.append(tuple(clip))
+    finally:
+        if proc:
+            proc.stdin.close()
+            await proc.wait()
+    return clips
+
+def ensure_ack_clips(config):
+    ack_settings = config.get("ack_clips", {})
+    if not ack_settings.get("enabled"):
+        return
+    voice = config["voice"]
+    retro_voice_fx = config.get("retro_voice_fx", False)
+    phrases = ack_settings.get("phrases", ACK_PHRASES)
+    ack_bank.ensure(
+        (voice, retro_voice_fx),
+        lambda: render_ack_clips(voice, retro_voice_fx, phrases, config.get("tts_engine", "subprocess"))
+    )
 
-    for i in range(0, len(sox_stdout), 2048):
-        yield sox_stdout[i:i+2048]
+async def send_model_status(websocket, session_config):
+    model = session_config["model_name"]
+    models = [model]
+    if session_config.get("fast_model_name"):
+        models.append(session_config["fast_model_name"])
+    # "ready" may be stale after an idle spell, so ask Ollama before reporting it
+    await residency.verify(models)
+    for m in models:
+        residency.ensure(m)
+
+    # Tell the client while the model is loading, then again once it is resident
+    try:
+        await websocket.send(json.dumps(residency.status(model)))
+        if residency.state(model) != "ready":
+            await residency.wait_settled(model)
+            await websocket.send(json.dumps(residency.status(model)))
+    except websockets.ConnectionClosed:
+        pass
 
 async def process_connection(websocket):
     recognizer = KaldiRecognizer(vosk_model, RATE)
+    command_recognizer = None
+    command_phrases = {}
+    last_reply = []
+    cache_settings = {}
+    speculative_settings = {}
+    fx = None
+    speculation = None
+    partial_text = ""
+    partial_since = 0.0
     session_config = None
     piper_proc = None
+    tts_engine = None
+    reply_task = None
+    speaking = False  # from the start of a reply until the client has played it
+
+    def start_reply(coro):
+        nonlocal reply_task, speaking
+        speaking = True
+        reply_task = asyncio.create_task(run_reply(coro))
+
+    async def run_reply(coro):
+        try:
+            await coro
+        except websockets.ConnectionClosed:
+            pass
+        except Exception as e:
+            print(f"[Server] Reply failed: {e}")
+            try:
+                await websocket.send("__END__")  # let the client reopen the mic
+            except websockets.ConnectionClosed:
+                pass
+
+    async def stop_reply(marker=None):
+        # Cancelling the reply closes the Ollama stream and stops TTS. The
+        # marker goes out right away; cleanup (e.g. draining Piper) follows.
+        nonlocal reply_task
+        task, reply_task = reply_task, None
+        if task and not task.done():
+            task.cancel()
+        if marker:
+            await websocket.send(marker)
+        if task:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def run_command(action):
+        print(f"[Command] {action}")
+        if action == "stop_speaking":
+            await stop_reply("__STOP__")
+        elif action == "repeat":
+            if speaking:
+                print("[Command] Already speaking, ignoring repeat")
+            else:
+                start_reply(replay_reply(websocket, last_reply))
+        elif action == "end_session":
+            await stop_reply("__END_SESSION__")
+        else:
+            print(f"[Command] Unknown action: {action}")
+
+    def reply_cache_key(transcript, model):
+        if not cache_settings.get("enabled"):
+            return None
+        return ResponseCache.make_key(
+            transcript,
+            model,
+            session_config.get("system_prompt", ""),
+            session_config["voice"],
+            session_config.get("retro_voice_fx", False)
+        )
+
+    async def respond(spec, model, user_text, cache_key, turn_start):
+        nonlocal last_reply
+        led_request("blink")
+
+        # Mask a slow first reply with a short in-character acknowledgement
+        ack = None
+        ack_settings = session_config.get("ack_clips", {})
+        expected = ttfa_estimator.expected(model)
+        if ack_settings.get("enabled") and (expected is None or expected * 1000 > ack_settings.get("min_expected_ms", 1500)):
+            clip = ack_bank.pick((session_config["voice"], session_config.get("retro_voice_fx", False)))
+            if clip:
+                ack = AckPlayback(websocket, clip, ack_settings.get("grace_ms", 300) / 1000)
+
+        async def before_audio():
+            # A speculative turn's head start would drag the estimate down
+            if not spec:
+                ttfa_estimator.record(model, time.monotonic() - turn_start)
+            if ack:
+                await ack.finish()
+
+        if spec:
+            speculation_stats.hit(spec.head_start())
+            tokens = spec.commit()
+        else:
+            context = build_context(session_config, user_text)
+            tokens = router.timed(model, stream_ollama_response(model, context))
+        try:
+            reply_text, last_reply = await speak_reply(
+                websocket, tokens, tts_engine or piper_proc, session_config, fx, before_audio
+            )
+        except asyncio.CancelledError:
+            if ack:
+                await ack.cancel()
+            raise
+        finally:
+            if spec:
+                await spec.cancel()
+            if ack:
+                await ack.finish()  # never leave the clip task running, even on errors
+
+        if cache_key and reply_text:
+            response_cache.put(cache_key, reply_text, last_reply)
+            print(f"[Cache] Stored reply ({response_cache.stats()})")
+
+        await websocket.send("__END__")
+        led_request("solid")
 
     async for message in websocket:
         if isinstance(message, str):
             if message.strip() == "__done__":
+                speaking = False
                 led_request("solid")
                 continue
             try:
@@ -135,12 +503,41 @@ async def process_connection(websocket):
                     session_config = data.get("config", {})
                     print("[Server] Config synced:", session_config.get("voice"))
 
+                    asyncio.create_task(send_model_status(websocket, session_config))
+
+                    phrases = session_config.get("command_phrases", COMMAND_PHRASES)
+                    command_phrases = {normalize_transcript(k): v for k, v in phrases.items()}
+                    command_recognizer = build_command_recognizer(command_phrases)
+
+                    speculative_settings = session_config.get("speculative_llm", {})
+                    ensure_ack_clips(session_config)
+                    fx = None
+                    if session_config.get("retro_voice_fx", False):
+                        # One chain per connection so filter/compander state carries across sentences
+                        fx = RadioFX(get_voice_sample_rate(session_config["voice"]))
+                    cache_settings = session_config.get("response_cache", {})
+                    if cache_settings.get("enabled"):
+                        response_cache.configure(
+                            cache_settings.get("max_entries", 64),
+                            cache_settings.get("ttl_seconds", 3600),
+                            cache_settings.get("variants", 1)
+                        )
+
                     voice_model_path = f"voices/{session_config['voice']}"
                     if not os.path.exists(voice_model_path):
                         print(f"[ERROR] Voice model not found: {voice_model_path}")
                         await websocket.send("__ERROR__: Voice model not found.")
                         continue
 
+                    if session_config.get("tts_engine", "subprocess") == "onnx":
+                        try:
+                            tts_engine = await asyncio.to_thread(
+                                load_voice, voice_model_path, session_config.get("tts_threads", 0)
+                            )
+                            continue
+                        except Exception as e:
+                            print(f"[Piper] In-process engine unavailable, using subprocess: {e}")
+
                     try:
                         piper_proc = await asyncio.create_subprocess_exec(
                             PIPER_PATH, '--model', voice_model_path, '--output_raw',
@@ -171,48 +568,115 @@ async def process_connection(websocket):
         if session_config is None:
             continue  # wait until config is set
 
+        # Fast path: command words are spotted by the grammar recognizer
+        # and handled locally, discarding whatever the full recognizer heard.
+        # It keeps listening while a reply plays, so "stop" can cut it short.
+        if command_recognizer and command_recognizer.AcceptWaveform(message):
+            command_text = json.loads(command_recognizer.Result()).get("text", "")
+            action = command_phrases.get(normalize_transcript(command_text))
+            if action:
+                print(f"\033[38;5;35m[User]: {command_text}\033[0m")
+                recognizer.Reset()
+                partial_text = ""
+                if speculation:
+                    await speculation.cancel()
+                    speculation = None
+                await run_command(action)
+                continue
+
+        if speaking:
+            # Only command phrases count while the trooper talks; the full
+            # recognizer would just transcribe his own voice off the speaker
+            continue
+
         if recognizer.AcceptWaveform(message):
+            turn_start = time.monotonic()
             result = json.loads(recognizer.Result())
             user_text = result.get("text", "").strip()
+            cleaned = normalize_transcript(user_text)
+
+            # Settle any speculative stream against the final transcript
+            spec = speculation
+            speculation = None
+            partial_text = ""
+            if spec and spec.transcript != cleaned:
+                await spec.cancel()
+                speculation_stats.miss()
+                spec = None
+
             if not user_text:
                 continue
 
-            cleaned = user_text.lower().strip(".,!? ")
             if cleaned in LOW_EFFORT_UTTERANCES:
-                recognizer = KaldiRecognizer(vosk_model, RATE)
+                recognizer.Reset()
+                continue
+
+            if cleaned in command_phrases:
+                print(f"\033[38;5;35m[User]: {user_text}\033[0m")
+                if command_recognizer:
+                    command_recognizer.Reset()
+                await run_command(command_phrases[cleaned])
                 continue
 
             # color code the output
             print(f"\033[38;5;35m[User]: {user_text}\033[0m")
-            messages = [{"role": "system", "content": session_config.get("system_prompt", "")}]
-            messages.append({"role": "user", "content": user_text})
-            led_request("blink")
-
-            context = [messages[0]] + messages[-session_config.get("history_length", 0):]
-            full_response = ""
-            response_text = ""
-
-            async for token in stream_ollama_response(session_config["model_name"], context):
-                response_text += token
-                if token.endswith((".", "!", "?", "\n")):
-                    segment = clean_response(response_text).strip()
-                    if segment and not re.fullmatch(r"[.?!\-–—…]+", segment):
-                        # color code the output
-                        print(f"\033[38;5;75m[Trooper]: {segment}\033[0m")
-                        full_response += segment + " "
-                        led_request("speak")
-                        async for chunk in stream_tts(segment, piper_proc, session_config.get("retro_voice_fx", False), session_config["voice"]):    
-                            await websocket.send(chunk)
-                    response_text = ""
-
-            if response_text.strip():
-                segment = clean_response(response_text).strip()
-                full_response += segment + " "
-                async for chunk in stream_tts(segment, piper_proc, session_config.get("retro_voice_fx", False), session_config["voice"]):
-                    await websocket.send(chunk)
 
-            await websocket.send("__END__")
-            led_request("solid")
+            if spec:
+                model, reason = spec.model, "speculative"
+            else:
+                model, reason = router.route(cleaned, session_config)
+            router.log_decision(model, reason)
+
+            cache_key = reply_cache_key(cleaned, model)
+            if cache_key:
+                cached = response_cache.get(cache_key)
+                if cached:
+                    if spec:
+                        # Cached after speculation started (e.g. by another session)
+                        await spec.cancel()
+                        speculation_stats.miss("reply served from cache")
+                    reply_text, last_reply = cached
+                    print(f"\033[38;5;75m[Trooper] (cached): {reply_text}\033[0m")
+                    start_reply(replay_reply(websocket, last_reply))
+                    continue
+
+            # The reply runs as a task so this loop keeps feeding the command recognizer
+            start_reply(respond(spec, model, user_text, cache_key, turn_start))
+
+        elif speculative_settings.get("enabled"):
+            # Start the LLM early once the partial transcript stops changing.
+            # Tokens stay buffered until the final result confirms the text.
+            partial = json.loads(recognizer.PartialResult()).get("partial", "").strip()
+            cleaned_partial = normalize_transcript(partial)
+            now = time.monotonic()
+            if cleaned_partial != partial_text:
+                partial_text = cleaned_partial
+                partial_since = now
+                if speculation:
+                    await speculation.cancel()
+                    speculation_stats.miss()
+                    speculation = None
+            elif (
+                speculation is None
+                and cleaned_partial
+                and cleaned_partial not in LOW_EFFORT_UTTERANCES
+                and cleaned_partial not in command_phrases
+                and now - partial_since >= speculative_settings.get("stable_ms", 400) / 1000
+            ):
+                model, _ = router.route(cleaned_partial, session_config)
+                cache_key = reply_cache_key(cleaned_partial, model)
+                # A cached reply needs no head start
+                if not (cache_key and response_cache.has(cache_key)):
+                    context = build_context(session_config, partial)
+                    speculation = SpeculativeStream(
+                        cleaned_partial,
+                        router.timed(model, stream_ollama_response(model, context)),
+                        model
+                    )
+
+    await stop_reply()
+    if speculation:
+        await speculation.cancel()
 
     try:
         if piper_proc and piper_proc.stdin:
@@ -221,9 +685,31 @@ async def process_connection(websocket):
     except Exception as e:
         print(f"[Piper] Shutdown error: {e}")
 
+async def handle_connection(websocket):
+    residency.session_started()
+    try:
+        await process_connection(websocket)
+    finally:
+        residency.session_ended()
+
 async def main():
+    global residency, router
+    config = load_config()
+    residency = ModelResidency(
+        PIPER_PATH,
+        config.get("ollama_keep_alive", "30m"),
+        config.get("ollama_ping_interval", 240)
+    )
+    health = await residency.check_health()
+    print(f"[Server] Backend health: {health}")
+    residency.ensure(config["model_name"])  # preload in the background
+    if config.get("fast_model_name"):
+        residency.ensure(config["fast_model_name"])
+    router = ModelRouter(residency)
+    ensure_ack_clips(config)  # per-voice clip bank for the default voice
+
     print("[Server] Listening on ws://0.0.0.0:8765 ...")
-    async with websockets.serve(process_connection, "0.0.0.0", 8765, ping_timeout=None, ping_interval=None):
+    async with websockets.serve(handle_connection, "0.0.0.0", 8765, ping_timeout=None, ping_interval=None):
         await asyncio.Future()
 
 if __name__ == "__main__":
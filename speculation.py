@@ -0,0 +1,82 @@
+# speculation.py
+import asyncio
+import time
+
+class SpeculativeStream:
+    """Runs an LLM token stream ahead of the final transcript.
+
+    Tokens are buffered, never spoken, until commit() is called. If the final
+    transcript turns out different, cancel() stops the stream (and its curl
+    process) so the real request can start.
+    """
+
+    def __init__(self, transcript, tokens, model=None):
+        self.transcript = transcript
+        self.model = model
+        self.started = time.monotonic()
+        self.finished = None
+        self._tokens = []
+        self._done = False
+        self._changed = asyncio.Event()
+        self._task = asyncio.create_task(self._run(tokens))
+
+    async def _run(self, tokens):
+        try:
+            async for token in tokens:
+                self._tokens.append(token)
+                self._changed.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Speculative] Stream failed: {e}")
+        finally:
+            await tokens.aclose()
+            self.finished = time.monotonic()
+            self._done = True
+            self._changed.set()
+
+    def head_start(self):
+        """Seconds of generation already done, i.e. latency saved if committed now."""
+        return (self.finished or time.monotonic()) - self.started
+
+    async def commit(self):
+        """Yield the buffered tokens, then the rest of the live stream."""
+        i = 0
+        while True:
+            if i < len(self._tokens):
+                yield self._tokens[i]
+                i += 1
+                continue
+            if self._done:
+                break
+            self._changed.clear()
+            if i == len(self._tokens) and not self._done:
+                await self._changed.wait()
+
+    async def cancel(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+class SpeculationStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.saved = 0.0
+
+    def hit(self, saved):
+        self.hits += 1
+        self.saved += saved
+        print(f"[Speculative] Hit, saved {saved:.2f}s ({self.summary()})")
+
+    def miss(self, reason="restarting"):
+        self.misses += 1
+        print(f"[Speculative] Miss, {reason} ({self.summary()})")
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        avg = self.saved / self.hits if self.hits else 0.0
+        return f"hit rate {self.hits}/{total} ({rate:.0%}), avg saved {avg:.2f}s, total saved {self.saved:.1f}s"
@@ -11,17 +11,58 @@ def load_config():
         "mic_name": "USB Camera-B4.09.24.1: Audio",
         "audio_output_device": "USB PnP Sound Device: Audio",
         "model_name": "gemma3:1b",
+        "fast_model_name": "",
+        "model_router": {
+            "short_words": 4,
+            "long_words": 12,
+            "max_first_token_ms": 4000,
+            "retry_after_s": 120
+        },
         "voice": "danny-low.onnx",
+        "tts_engine": "subprocess",
+        "tts_threads": 0,
         "mute_mic_during_playback": True,
+        "commands_during_playback": False,
         "fade_duration_ms": 50,
+        "mic_queue_size": 32,
+        "mic_queue_policy": "drop_oldest",
+        "playback_queue_size": 16,
+        "playback_queue_policy": "block",
+        "queue_stats_interval": 30,
         "retro_voice_fx": False,
         "history_length": 6,
+        "ollama_keep_alive": "30m",
+        "ollama_ping_interval": 240,
         "system_prompt": "You are a loyal Imperial Stormtrooper. You need to keep order. Your weapon is a gun. Don’t ask to help or assist.",
         "greeting_message": "Identify yourself!",
         "closing_message": "Mission completed. Carry on with your civilian duties.",
         "timeout_message": "Communication terminated. Returning to base.",
         "session_timeout": 500,
-        "vision_wake": False
+        "vision_wake": False,
+        "command_phrases": {
+            "stop": "stop_speaking",
+            "be quiet": "stop_speaking",
+            "say again": "repeat",
+            "repeat that": "repeat",
+            "goodbye": "end_session",
+            "over and out": "end_session"
+        },
+        "ack_clips": {
+            "enabled": False,
+            "phrases": ["Copy that.", "Stand by.", "Affirmative.", "Checking."],
+            "min_expected_ms": 1500,
+            "grace_ms": 300
+        },
+        "speculative_llm": {
+            "enabled": False,
+            "stable_ms": 400
+        },
+        "response_cache": {
+            "enabled": False,
+            "max_entries": 64,
+            "ttl_seconds": 3600,
+            "variants": 1
+        }
     }
 
     try: